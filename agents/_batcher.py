@@ -0,0 +1,82 @@
+"""
+_batcher.py – Micro-batching helper that coalesces concurrent requests.
+"""
+
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collect items submitted from any thread and process them in batches.
+
+    A daemon worker waits for the first item, keeps collecting for up to
+    `max_wait_ms` (or until `max_batch_size` items are queued), then calls
+    `process_batch` once for the whole group.
+
+    Args:
+        process_batch: Maps a list of items to a list of results of the
+            same length and order.
+        max_batch_size: Upper bound on items per batch.
+        max_wait_ms: How long to wait for more items after the first one.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[list[T]], list[R]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self._process_batch = process_batch
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._queue: queue.SimpleQueue[tuple[T, Future]] = queue.SimpleQueue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: T) -> Future:
+        """Queue an item and return a Future resolving to its result."""
+        future: Future = Future()
+        self._queue.put((item, future))
+        if self._worker is None:
+            self._start_worker()
+        return future
+
+    def _start_worker(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list[tuple[T, Future]]:
+        """Block for one item, then gather more until the batch is full or time is up."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                results = self._process_batch([item for item, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
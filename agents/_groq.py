@@ -0,0 +1,41 @@
+"""
+_groq.py – Shared Groq model client for the planner and reasoner agents.
+"""
+
+import functools
+import os
+
+import httpx
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+MODEL = "llama-3.1-8b-instant"
+MAX_CONNECTIONS = 32  # pooled keep-alive connections to Groq
+
+
+@functools.cache
+def groq_client() -> OpenAIChatCompletionClient:
+    """
+    Return the OpenAI-compatible model client pointing to Groq, created once.
+
+    Pooled httpx connections are bound to the loop they were opened on, so
+    the client must only be used from the agents event loop (see _runtime).
+    """
+    return OpenAIChatCompletionClient(
+        model=MODEL,
+        api_key=GROQ_API_KEY,
+        base_url="https://api.groq.com/openai/v1",
+        model_info={
+            "vision": False,
+            "function_calling": True,
+            "json_output": True,
+            "family": "unknown",
+        },
+        http_client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_CONNECTIONS,
+            ),
+        ),
+    )
@@ -0,0 +1,61 @@
+"""
+_json_stream.py – Streams an agent's reply while validating it as JSON.
+"""
+
+from contextlib import aclosing
+
+import ijson
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent, TextMessage
+from autogen_core import CancellationToken
+
+
+async def stream_json_reply(
+    agent: AssistantAgent,
+    content: str,
+    cancellation_token: CancellationToken,
+    name: str,
+) -> str:
+    """
+    Send `content` to a streaming agent and return its raw JSON reply.
+
+    Token deltas are pushed into ijson's incremental parser as they arrive,
+    so a reply that stops being valid JSON (prose, code fences, a second
+    object) cancels the completion at that token instead of after the
+    full body has been downloaded.
+
+    Args:
+        agent: An AssistantAgent created with model_client_stream=True.
+        content: The user message to send.
+        cancellation_token: Token used to abort the request on bad output.
+        name: Agent label used in error messages (e.g. "planner").
+
+    Returns:
+        The complete reply text, guaranteed to be one JSON document.
+
+    Raises:
+        ValueError: If the reply is not well-formed JSON.
+    """
+    buffer = bytearray()
+    events = ijson.sendable_list()
+    parser = ijson.basic_parse_coro(events)
+
+    stream = agent.on_messages_stream(
+        [TextMessage(content=content, source="user")],
+        cancellation_token=cancellation_token,
+    )
+    try:
+        async with aclosing(stream):
+            async for item in stream:
+                if isinstance(item, ModelClientStreamingChunkEvent):
+                    data = item.content.encode()
+                    buffer += data
+                    parser.send(data)
+                    events.clear()
+        parser.close()
+    except ijson.JSONError as exc:
+        cancellation_token.cancel()
+        raw = buffer.decode(errors="replace").strip()
+        raise ValueError(f"Failed to parse {name} response as JSON:\n{raw}") from exc
+
+    return buffer.decode()
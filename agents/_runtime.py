@@ -0,0 +1,71 @@
+"""
+_runtime.py – Long-lived event loop for the synchronous agent wrappers.
+
+plan_query, reason and run_pipeline are called from plain threads (Streamlit
+script runs, FastAPI worker threads). Instead of building and tearing down a
+loop with asyncio.run() on every call, one daemon thread runs a loop forever
+and callers submit coroutines to it, so the loop and the pooled Groq client
+survive across queries. uvloop is used when it is installed, and tasks use
+the eager task factory.
+"""
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create a uvloop loop if available, else the default asyncio loop.
+
+    Tasks are started eagerly: a gathered coroutine that finishes without
+    suspending (regex-planned queries, cache hits) completes inline instead
+    of taking a round-trip through the scheduler.
+    """
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    loop.set_task_factory(asyncio.eager_task_factory)
+    return loop
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start the background loop thread on first use and return its loop."""
+    global _loop, _loop_thread
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = _new_event_loop()
+                _loop_thread = threading.Thread(target=loop.run_forever, name="agents-loop", daemon=True)
+                _loop_thread.start()
+                _loop = loop
+    return _loop
+
+
+def _submit(coro: Coroutine[Any, Any, T]) -> Future:
+    """Schedule a coroutine on the background loop; thread-safe."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the background loop and block until it finishes.
+
+    Raises:
+        RuntimeError: If called from the loop thread itself (it would deadlock).
+    """
+    if _loop_thread is not None and threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the agents event loop thread.")
+    return _submit(coro).result()
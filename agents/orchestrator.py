@@ -1,54 +1,90 @@
 """
-orchestrator.py – Wires PlannerAgent and RetrieverAgent together using AutoGen.
+orchestrator.py – Wires PlannerAgent and retrieval together using AutoGen.
+
+The planner's LLM call, the FAISS retrieval and the optional numeric tool
+run concurrently; retrieval is refined afterwards only when the planner
+narrows the focus.
 """
 
 import asyncio
-import json
 
-from autogen_agentchat.messages import TextMessage
-from autogen_core import CancellationToken
+import pandas as pd
 
-from agents.planner import create_planner_agent
-from agents.retriever import create_retriever_agent
+from agents._runtime import run_sync
+from agents.planner import _async_plan_query
+from agents.retriever import _format_chunks, _normalize_query, _retrieve_from_store
+from agents.tool_executor import execute as execute_tool
 from vector_store.faiss_store import FAISSStore
 
 
-async def _async_run_pipeline(query: str, store: FAISSStore, top_k: int = 5) -> dict:
-    """Async implementation of run_pipeline."""
-    cancellation_token = CancellationToken()
+def _merge_results(primary: list[dict], secondary: list[dict], top_k: int) -> list[dict]:
+    """Merge two result lists, dropping duplicate chunks and keeping the best top_k."""
+    merged: dict[str, dict] = {}
+    for r in primary + secondary:
+        seen = merged.get(r["text"])
+        if seen is None or r["score"] > seen["score"]:
+            merged[r["text"]] = r
+    return sorted(merged.values(), key=lambda r: r["score"], reverse=True)[:top_k]
+
+
+def _speculative_metrics(df: pd.DataFrame) -> dict | None:
+    """Average of the first numeric column, computed before the plan is known."""
+    numeric_cols = df.select_dtypes(include="number").columns.tolist()
+    if not numeric_cols:
+        return None
+    try:
+        return execute_tool(df, "average", numeric_cols[0])
+    except ValueError:
+        return None
 
-    # --- Step 1: Plan ---
-    planner = create_planner_agent()
-    plan_response = await planner.on_messages(
-        [TextMessage(content=query, source="user")],
-        cancellation_token=cancellation_token,
-    )
 
-    raw_plan = plan_response.chat_message.content.strip()
+async def _plan(query: str) -> dict:
+    """Plan the query, falling back to an error plan if the planner's reply is unusable."""
     try:
-        plan = json.loads(raw_plan)
-    except json.JSONDecodeError:
-        plan = {"raw_response": raw_plan, "error": "Failed to parse plan"}
+        return await _async_plan_query(query)
+    except ValueError as exc:
+        return {"raw_response": str(exc), "error": "Failed to parse plan"}
+
+
+async def _async_run_pipeline(
+    query: str,
+    store: FAISSStore,
+    top_k: int = 5,
+    dataframe: pd.DataFrame | None = None,
+) -> dict:
+    """Async implementation of run_pipeline."""
+    # --- Step 1: Plan, retrieve and (speculatively) compute metrics at once ---
+    coros = [
+        _plan(query),
+        asyncio.to_thread(_retrieve_from_store, query, store, top_k),
+    ]
+    if dataframe is not None:
+        coros.append(asyncio.to_thread(_speculative_metrics, dataframe))
 
-    # --- Step 2: Retrieve ---
-    retrieval_query = plan.get("retrieval_focus", query)
+    plan, results, *tool_results = await asyncio.gather(*coros)
 
-    retriever = create_retriever_agent(store, top_k=top_k)
-    retrieval_response = await retriever.on_messages(
-        [TextMessage(content=retrieval_query, source="PlannerAgent")],
-        cancellation_token=cancellation_token,
-    )
+    # --- Step 2: Refine retrieval if the planner narrowed the focus ---
+    retrieval_focus = plan.get("retrieval_focus", query)
+    if isinstance(retrieval_focus, str) and _normalize_query(retrieval_focus) != _normalize_query(query):
+        focused = await asyncio.to_thread(_retrieve_from_store, retrieval_focus, store, top_k)
+        results = _merge_results(focused, results, top_k)
 
-    chunks_text = retrieval_response.chat_message.content
+    metrics = tool_results[0] if tool_results and plan.get("needs_numeric") else None
 
     return {
         "query": query,
         "plan": plan,
-        "chunks": chunks_text,
+        "chunks": _format_chunks(results) or "No relevant chunks found.",
+        "metrics": metrics,
     }
 
 
-def run_pipeline(query: str, store: FAISSStore, top_k: int = 5) -> dict:
+def run_pipeline(
+    query: str,
+    store: FAISSStore,
+    top_k: int = 5,
+    dataframe: pd.DataFrame | None = None,
+) -> dict:
     """
     End-to-end pipeline: plan the query, then retrieve relevant chunks.
 
@@ -56,11 +92,13 @@ def run_pipeline(query: str, store: FAISSStore, top_k: int = 5) -> dict:
         query: The user's natural language question.
         store: A populated FAISSStore instance.
         top_k: Number of chunks to retrieve.
+        dataframe: Optional CSV DataFrame for numeric analysis.
 
     Returns:
         A dict containing:
         - "plan": the structured analysis plan from the planner.
-        - "chunks": the retrieved chunk texts from the retriever.
+        - "chunks": the retrieved chunk texts.
         - "query": the original query.
+        - "metrics": numeric tool output, or None if not needed/available.
     """
-    return asyncio.run(_async_run_pipeline(query, store, top_k))
+    return run_sync(_async_run_pipeline(query, store, top_k, dataframe))
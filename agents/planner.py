@@ -2,15 +2,17 @@
 planner.py – AutoGen-based planner agent that uses Groq LLM to analyze user queries.
 """
 
-import asyncio
-import json
-import os
+import re
+
+import orjson
 
 from autogen_agentchat.agents import AssistantAgent
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-MODEL = "llama-3.1-8b-instant"
+from agents._groq import groq_client
+from agents._json_stream import stream_json_reply
+from agents._runtime import run_sync
+
+_REQUIRED_KEYS = frozenset(("analysis_type", "needs_numeric", "retrieval_focus"))
 
 SYSTEM_PROMPT = """You are a query planner for a document Q&A system.
 Given a user query, analyze what type of analysis is needed and respond with ONLY valid JSON (no extra text):
@@ -26,57 +28,94 @@ Rules:
 - Keep retrieval_focus concise — one sentence max.
 - Always respond with valid JSON only."""
 
-
-def _create_groq_client() -> OpenAIChatCompletionClient:
-    """Create an OpenAI-compatible model client pointing to Groq."""
-    return OpenAIChatCompletionClient(
-        model=MODEL,
-        api_key=GROQ_API_KEY,
-        base_url="https://api.groq.com/openai/v1",
-        model_info={
-            "vision": False,
-            "function_calling": True,
-            "json_output": True,
-            "family": "unknown",
-        },
-    )
+# Cheap pre-classifier: queries that clearly match one of these are planned
+# without an LLM round-trip. Anything ambiguous still goes to the planner.
+_NUMERIC_RE = re.compile(
+    r"\b(average|mean|median|sum|growth|percent(age)?|how many|how much"
+    r"|max(imum)?|min(imum)?|highest|lowest|largest|smallest"
+    r"|total (number|amount|count)|(rate|count|total) of)\b"
+)
+# Bare "rate", "count" and "total" are too common in prose ("interest rate
+# policy") to classify a query, but may still mean it is numeric, so without
+# one of the phrases above they send it to the planner.
+_NUMERIC_HINT_RE = re.compile(r"\b(rate|count|total)s?\b")
+_COMPARISON_RE = re.compile(r"\b(compare[ds]?|comparison|versus|vs\.?|difference between)\b")
+_SUMMARY_RE = re.compile(
+    r"\b(summar(y|ise|ize)|overview|tl;?dr|main (points|ideas|topics)|key (points|takeaways))\b"
+    r"|\bwhat is (this|the) (document|file) about\b"
+)
+_LOOKUP_RE = re.compile(r"^(who|when|where|which|what is the name)\b")
 
 
 def create_planner_agent() -> AssistantAgent:
     """
     Create and return an AutoGen AssistantAgent configured as the planner.
+
+    Must be called from the agents event loop, which owns the shared Groq
+    client. The agent keeps its own chat history, so a fresh one is built
+    per query; only the client is shared.
     """
-    client = _create_groq_client()
+    client = groq_client()
     planner = AssistantAgent(
         name="PlannerAgent",
         model_client=client,
         system_message=SYSTEM_PROMPT,
+        model_client_stream=True,
     )
     return planner
 
 
+def _fast_plan(query: str) -> dict | None:
+    """
+    Plan obvious queries with regexes instead of the LLM.
+
+    Returns:
+        A plan dict, or None if the query is ambiguous and needs the planner.
+    """
+    text = query.lower()
+    if _COMPARISON_RE.search(text):
+        return None
+
+    matches = [
+        (analysis_type, needs_numeric)
+        for pattern, analysis_type, needs_numeric in (
+            (_NUMERIC_RE, "numeric_analysis", True),
+            (_SUMMARY_RE, "summarization", False),
+            (_LOOKUP_RE, "factual_lookup", False),
+        )
+        if pattern.search(text)
+    ]
+    # No match, or more than one (e.g. "overview of the highest ..."): ambiguous
+    if len(matches) != 1:
+        return None
+    (analysis_type, needs_numeric), = matches
+    if not needs_numeric and _NUMERIC_HINT_RE.search(text):
+        return None
+
+    return {
+        "analysis_type": analysis_type,
+        "needs_numeric": needs_numeric,
+        "retrieval_focus": query,
+    }
+
+
 async def _async_plan_query(query: str) -> dict:
     """Async implementation of plan_query."""
     from autogen_core import CancellationToken
-    from autogen_agentchat.messages import TextMessage
-
-    planner = create_planner_agent()
-
-    response = await planner.on_messages(
-        [TextMessage(content=query, source="user")],
-        cancellation_token=CancellationToken(),
-    )
 
-    raw = response.chat_message.content.strip()
+    plan = _fast_plan(query)
+    if plan is not None:
+        return plan
 
+    planner = create_planner_agent()
+    raw = await stream_json_reply(planner, query, CancellationToken(), name="planner")
     try:
-        plan = json.loads(raw)
-    except json.JSONDecodeError:
-        raise ValueError(f"Failed to parse planner response as JSON:\n{raw}")
+        plan = orjson.loads(raw)
+    except orjson.JSONDecodeError as exc:
+        raise ValueError(f"Planner response is not valid JSON: {raw}") from exc
 
-    for key in ("analysis_type", "needs_numeric", "retrieval_focus"):
-        if key not in plan:
-            raise ValueError(f"Missing key '{key}' in planner response: {plan}")
+    if not (isinstance(plan, dict) and _REQUIRED_KEYS.issubset(plan)):
+        raise ValueError(f"Missing one of {sorted(_REQUIRED_KEYS)} in planner response: {plan}")
 
     return plan
 
@@ -94,4 +133,4 @@ def plan_query(query: str) -> dict:
     Raises:
         ValueError: If the LLM response cannot be parsed as JSON.
     """
-    return asyncio.run(_async_plan_query(query))
+    return run_sync(_async_plan_query(query))
@@ -5,17 +5,18 @@ Takes retrieved chunks, optional numeric metrics, and the user query
 to produce a grounded, structured answer.
 """
 
-import asyncio
 import json
-import os
+
+import orjson
 
 from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.messages import TextMessage
 from autogen_core import CancellationToken
-from autogen_ext.models.openai import OpenAIChatCompletionClient
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-MODEL = "llama-3.1-8b-instant"
+from agents._groq import groq_client
+from agents._json_stream import stream_json_reply
+from agents._runtime import run_sync
+
+_REQUIRED_KEYS = frozenset(("answer", "confidence", "sources_used"))
 
 SYSTEM_PROMPT = """You are a reasoning agent for a document Q&A system.
 
@@ -38,28 +39,18 @@ Respond with ONLY valid JSON (no extra text):
 }"""
 
 
-def _create_groq_client() -> OpenAIChatCompletionClient:
-    """Create an OpenAI-compatible model client pointing to Groq."""
-    return OpenAIChatCompletionClient(
-        model=MODEL,
-        api_key=GROQ_API_KEY,
-        base_url="https://api.groq.com/openai/v1",
-        model_info={
-            "vision": False,
-            "function_calling": True,
-            "json_output": True,
-            "family": "unknown",
-        },
-    )
-
-
 def create_reasoner_agent() -> AssistantAgent:
-    """Create and return an AutoGen AssistantAgent configured as the reasoner."""
-    client = _create_groq_client()
+    """
+    Create and return an AutoGen AssistantAgent configured as the reasoner.
+
+    Must be called from the agents event loop; see planner.create_planner_agent.
+    """
+    client = groq_client()
     return AssistantAgent(
         name="ReasonerAgent",
         model_client=client,
         system_message=SYSTEM_PROMPT,
+        model_client_stream=True,
     )
 
 
@@ -82,21 +73,11 @@ async def _async_reason(query: str, chunks: str, metrics: dict | list | None = N
     prompt = _build_prompt(query, chunks, metrics)
     agent = create_reasoner_agent()
 
-    response = await agent.on_messages(
-        [TextMessage(content=prompt, source="user")],
-        cancellation_token=CancellationToken(),
-    )
-
-    raw = response.chat_message.content.strip()
-
-    try:
-        result = json.loads(raw)
-    except json.JSONDecodeError:
-        raise ValueError(f"Failed to parse reasoner response as JSON:\n{raw}")
+    raw = await stream_json_reply(agent, prompt, CancellationToken(), name="reasoner")
+    result = orjson.loads(raw)
 
-    for key in ("answer", "confidence", "sources_used"):
-        if key not in result:
-            raise ValueError(f"Missing key '{key}' in reasoner response: {result}")
+    if not (isinstance(result, dict) and _REQUIRED_KEYS.issubset(result)):
+        raise ValueError(f"Missing one of {sorted(_REQUIRED_KEYS)} in reasoner response: {result}")
 
     return result
 
@@ -116,4 +97,4 @@ def reason(query: str, chunks: str, metrics: dict | list | None = None) -> dict:
     Raises:
         ValueError: If the LLM response cannot be parsed as JSON.
     """
-    return asyncio.run(_async_reason(query, chunks, metrics))
+    return run_sync(_async_reason(query, chunks, metrics))
@@ -3,35 +3,160 @@ retriever.py – AutoGen-based retriever agent that searches FAISS for relevant
 """
 
 import asyncio
+import functools
+import io
+import threading
+import weakref
+from collections import OrderedDict
 
+import faiss
 import numpy as np
 from autogen_agentchat.agents import BaseChatAgent
 from autogen_agentchat.base import Response
 from autogen_agentchat.messages import ChatMessage, TextMessage
 from autogen_core import CancellationToken
-from sentence_transformers import SentenceTransformer
 
+from agents._batcher import MicroBatcher
+from ingestion.embedder import _load_model
 from vector_store.faiss_store import FAISSStore
 
-MODEL_NAME = "all-MiniLM-L6-v2"
+QUERY_CACHE_SIZE = 1024  # cached queries per store snapshot
+SIMILARITY_THRESHOLD = 0.97  # cosine above which a cached query's results are reused
+MAX_CACHED_STORES = 16
 
-_model: SentenceTransformer | None = None
 
+def _encode_batch(queries: list[str]) -> list[np.ndarray]:
+    """Embed a batch of queries in a single forward pass."""
+    embeddings = _load_model().encode(
+        queries,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+    return list(embeddings)
 
-def _load_model() -> SentenceTransformer:
-    """Lazy-load the embedding model (singleton)."""
-    global _model
-    if _model is None:
-        _model = SentenceTransformer(MODEL_NAME)
-    return _model
+
+# Concurrent retrievals (several sessions, or planner + speculative retrieval)
+# share one encode() call instead of running the encoder once per query.
+_query_batcher = MicroBatcher(_encode_batch, max_batch_size=32, max_wait_ms=5)
+
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _embed_query(normalized_query: str) -> bytes:
+    """
+    Embed a normalized query as raw float32 bytes, memoized.
+
+    Unlike the result cache, this survives store changes (new uploads), so a
+    repeated question skips the encoder even when its results must be
+    recomputed. The model is uncased, so embedding the normalized text gives
+    the same vector as the original query.
+    """
+    vector = _query_batcher.submit(normalized_query).result()
+    return vector.astype(np.float32, copy=False).tobytes()
+
+
+class _QueryCache:
+    """
+    Two-tier cache of retrieval results for one snapshot of a store.
+
+    Exact tier: normalized query text → results, evicted LRU.
+    Similarity tier: an IndexFlatIP over cached (unit-norm) query vectors; a
+    new query within SIMILARITY_THRESHOLD cosine of a cached one reuses its
+    results and skips the store search.
+    """
+
+    def __init__(self, store: FAISSStore):
+        self.store_ref = weakref.ref(store)
+        self.exact: OrderedDict[tuple[str, int], list[dict]] = OrderedDict()
+        self.index = faiss.IndexFlatIP(store.dimension)
+        self.similar: list[tuple[int, list[dict]]] = []  # (top_k, results) per index row
+
+    def get_exact(self, key: tuple[str, int]) -> list[dict] | None:
+        results = self.exact.get(key)
+        if results is not None:
+            self.exact.move_to_end(key)
+        return results
+
+    def get_similar(self, vector: np.ndarray, top_k: int) -> list[dict] | None:
+        if self.index.ntotal == 0:
+            return None
+        scores, ids = self.index.search(vector, min(4, self.index.ntotal))
+        for score, idx in zip(scores[0], ids[0]):
+            if idx != -1 and score >= SIMILARITY_THRESHOLD and self.similar[idx][0] == top_k:
+                return self.similar[idx][1]
+        return None
+
+    def put_exact(self, key: tuple[str, int], results: list[dict]) -> None:
+        self.exact[key] = results
+        self.exact.move_to_end(key)
+        if len(self.exact) > QUERY_CACHE_SIZE:
+            self.exact.popitem(last=False)
+
+    def put_similar(self, vector: np.ndarray, top_k: int, results: list[dict]) -> None:
+        if self.index.ntotal >= QUERY_CACHE_SIZE:
+            self.index.reset()
+            self.similar.clear()
+        self.index.add(vector)
+        self.similar.append((top_k, results))
+
+
+_caches: OrderedDict[tuple[int, int], _QueryCache] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_cache(store: FAISSStore) -> _QueryCache:
+    """Return the cache for the store's current contents (call with _cache_lock held)."""
+    key = (id(store), store.count())
+    cache = _caches.get(key)
+    if cache is None or cache.store_ref() is not store:
+        cache = _caches[key] = _QueryCache(store)
+    _caches.move_to_end(key)
+    if len(_caches) > MAX_CACHED_STORES:
+        _caches.popitem(last=False)
+    return cache
+
+
+def _normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used as a cache key."""
+    return " ".join(query.lower().split())
 
 
 def _retrieve_from_store(query: str, store: FAISSStore, top_k: int = 5) -> list[dict]:
-    """Core retrieval logic: embed query and search FAISS."""
-    model = _load_model()
-    query_embedding = model.encode([query], show_progress_bar=False)
-    query_vector = np.array(query_embedding, dtype=np.float32)
-    return store.search(query_vector, top_k=top_k)
+    """Core retrieval logic: embed query and search FAISS, consulting the query cache."""
+    normalized = _normalize_query(query)
+    key = (normalized, top_k)
+    with _cache_lock:
+        results = _get_cache(store).get_exact(key)
+    if results is not None:
+        return list(results)
+
+    query_vector = np.frombuffer(_embed_query(normalized), dtype=np.float32).reshape(1, -1)
+
+    with _cache_lock:
+        results = _get_cache(store).get_similar(query_vector, top_k)
+    if results is None:
+        results = store.search(query_vector, top_k=top_k, normalized=True)
+        with _cache_lock:
+            _get_cache(store).put_similar(query_vector, top_k, results)
+
+    with _cache_lock:
+        _get_cache(store).put_exact(key, results)
+    return list(results)
+
+
+def _format_chunks(results: list[dict]) -> str:
+    """Render search results as the markdown block handed to downstream agents."""
+    buf = io.StringIO()
+    for i, r in enumerate(results):
+        if i:
+            buf.write("\n\n---\n\n")
+        buf.write("**Chunk ")
+        buf.write(str(r["metadata"].get("chunk_index", i)))
+        buf.write("** (score: ")
+        buf.write(format(r["score"], ".4f"))
+        buf.write(")\n")
+        buf.write(r["text"])
+    return buf.getvalue()
 
 
 class RetrieverAgent(BaseChatAgent):
@@ -51,13 +176,10 @@ class RetrieverAgent(BaseChatAgent):
     async def on_messages(self, messages, cancellation_token: CancellationToken) -> Response:
         """Embed the last message and return matching chunks."""
         query = messages[-1].content if messages else ""
-        results = _retrieve_from_store(query, self._store, self._top_k)
+        # Encoding and FAISS search release the GIL; keep them off the event loop
+        results = await asyncio.to_thread(_retrieve_from_store, query, self._store, self._top_k)
 
-        formatted = "\n\n---\n\n".join(
-            f"**Chunk {r['metadata'].get('chunk_index', i)}** (score: {r['score']:.4f})\n{r['text']}"
-            for i, r in enumerate(results)
-        )
-        response_text = formatted or "No relevant chunks found."
+        response_text = _format_chunks(results) or "No relevant chunks found."
         return Response(chat_message=TextMessage(content=response_text, source=self.name))
 
     async def on_reset(self, cancellation_token: CancellationToken) -> None:
@@ -2,8 +2,29 @@
 tool_executor.py – Performs numeric operations on a DataFrame and returns structured JSON.
 """
 
+import numpy as np
 import pandas as pd
 
+SUPPORTED_OPERATIONS = ("average", "sum", "growth_rate")
+
+
+def _column_values(df: pd.DataFrame, column: str) -> np.ndarray:
+    """
+    Return the non-null values of a column as a float64 NumPy array.
+
+    Raises:
+        ValueError: If the column is missing or not numeric.
+    """
+    if column not in df.columns:
+        raise ValueError(f"Column '{column}' not found. Available: {list(df.columns)}")
+
+    try:
+        values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Column '{column}' is not numeric.") from exc
+
+    return values[~np.isnan(values)]
+
 
 def compute_average(df: pd.DataFrame, column: str) -> dict:
     """
@@ -12,10 +33,8 @@ def compute_average(df: pd.DataFrame, column: str) -> dict:
     Returns:
         {"operation": "average", "column": ..., "result": ...}
     """
-    if column not in df.columns:
-        raise ValueError(f"Column '{column}' not found. Available: {list(df.columns)}")
-
-    result = float(df[column].mean())
+    values = _column_values(df, column)
+    result = float(values.mean()) if values.size else float("nan")
     return {"operation": "average", "column": column, "result": round(result, 4)}
 
 
@@ -26,10 +45,7 @@ def compute_sum(df: pd.DataFrame, column: str) -> dict:
     Returns:
         {"operation": "sum", "column": ..., "result": ...}
     """
-    if column not in df.columns:
-        raise ValueError(f"Column '{column}' not found. Available: {list(df.columns)}")
-
-    result = float(df[column].sum())
+    result = float(_column_values(df, column).sum())
     return {"operation": "sum", "column": column, "result": round(result, 4)}
 
 
@@ -43,15 +59,12 @@ def compute_growth_rate(df: pd.DataFrame, column: str) -> dict:
     Returns:
         {"operation": "growth_rate", "column": ..., "first": ..., "last": ..., "result_pct": ...}
     """
-    if column not in df.columns:
-        raise ValueError(f"Column '{column}' not found. Available: {list(df.columns)}")
-
-    series = df[column].dropna()
-    if len(series) < 2:
+    values = _column_values(df, column)
+    if values.size < 2:
         raise ValueError(f"Need at least 2 non-null values to compute growth rate in '{column}'.")
 
-    first = float(series.iloc[0])
-    last = float(series.iloc[-1])
+    first = float(values[0])
+    last = float(values[-1])
 
     if first == 0:
         raise ValueError(f"First value in '{column}' is 0; cannot compute growth rate.")
@@ -81,13 +94,36 @@ def execute(df: pd.DataFrame, operation: str, column: str) -> dict:
     Raises:
         ValueError: If the operation or column is invalid.
     """
-    ops = {
-        "average": compute_average,
-        "sum": compute_sum,
-        "growth_rate": compute_growth_rate,
-    }
+    if operation == "average":
+        return compute_average(df, column)
+    if operation == "sum":
+        return compute_sum(df, column)
+    if operation == "growth_rate":
+        return compute_growth_rate(df, column)
 
-    if operation not in ops:
-        raise ValueError(f"Unsupported operation: '{operation}'. Supported: {list(ops.keys())}")
+    raise ValueError(f"Unsupported operation: '{operation}'. Supported: {list(SUPPORTED_OPERATIONS)}")
 
-    return ops[operation](df, column)
+
+def precompute_metrics(df: pd.DataFrame) -> dict[str, dict]:
+    """
+    Compute common statistics for every numeric column once, at ingestion time.
+
+    Args:
+        df: The pandas DataFrame to summarise.
+
+    Returns:
+        {column: {"average": ..., "sum": ..., "first": ..., "last": ...}},
+        where first/last are the first and last non-null values. Statistics
+        of an all-null column are None (sum is 0.0).
+    """
+    metrics = {}
+    for column in df.select_dtypes(include="number").columns:
+        values = _column_values(df, column)
+        has_values = values.size > 0
+        metrics[column] = {
+            "average": round(float(values.mean()), 4) if has_values else None,
+            "sum": round(float(values.sum()), 4),
+            "first": round(float(values[0]), 4) if has_values else None,
+            "last": round(float(values[-1]), 4) if has_values else None,
+        }
+    return metrics
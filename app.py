@@ -5,26 +5,29 @@ Upload a file (PDF / CSV / JSON), then ask questions interactively.
 Run with:  streamlit run app.py
 """
 
+import hashlib
 import json
 import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
+import pandas as pd
 import streamlit as st
 
-from ingestion.file_router import route_file
-from ingestion.pdf_parser import parse_pdf
-from ingestion.csv_parser import parse_csv
-from ingestion.json_parser import parse_json
-from ingestion.chunker import chunk_text
-from ingestion.embedder import embed_chunks
+from ingestion.file_router import PARSERS, route_file
+from ingestion.chunker import DEFAULT_CHUNK_SIZE, chunk_text
+from ingestion.embedder import BACKEND as EMBED_BACKEND, MODEL_NAME as EMBED_MODEL_NAME, embed_chunks
 
 from vector_store.faiss_store import FAISSStore
 
 from agents.planner import plan_query
-from agents.retriever import retrieve
-from agents.tool_executor import execute as execute_tool
+from agents.retriever import _format_chunks, retrieve
+from agents.tool_executor import precompute_metrics
 from agents.reasoner import reason
 
+# Built indexes are cached here, keyed by file content + ingestion params
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
 
 # ── Page config ──────────────────────────────────────────
 st.set_page_config(page_title="📘 Document Q&A", page_icon="📘", layout="wide")
@@ -88,6 +91,29 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+def _cache_dir_for(data: memoryview, filename: str) -> str:
+    """Cache folder for an upload: SHA-256 of its bytes and every ingestion parameter."""
+    h = hashlib.sha256(data)
+    h.update(f"|{filename}|{DEFAULT_CHUNK_SIZE}|{EMBED_MODEL_NAME}|{EMBED_BACKEND}".encode())
+    return os.path.join(CACHE_DIR, h.hexdigest())
+
+
+def _load_cached_store(cache_dir: str) -> FAISSStore | None:
+    """Memory-map a previously built store, or return None on a cache miss."""
+    if not os.path.isdir(cache_dir):
+        return None
+    try:
+        return FAISSStore.load(cache_dir, mmap=True)
+    except (OSError, RuntimeError, ValueError):  # incomplete or unreadable cache entry
+        return None
+
+
+@st.cache_resource
+def _get_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for overlapping planning and retrieval."""
+    return ThreadPoolExecutor(max_workers=4)
+
+
 # ── Header ───────────────────────────────────────────────
 st.markdown("""
 <div class="header-block">
@@ -102,6 +128,8 @@ if "store" not in st.session_state:
     st.session_state.store = None
 if "dataframe" not in st.session_state:
     st.session_state.dataframe = None
+if "metrics" not in st.session_state:
+    st.session_state.metrics = {}
 if "ingested" not in st.session_state:
     st.session_state.ingested = False
 if "chat_history" not in st.session_state:
@@ -131,29 +159,43 @@ with st.sidebar:
                     file_type = route_file(tmp_path)
                     st.info(f"📄 Detected: **{file_type.upper()}**")
 
-                    # Parse
+                    cache_dir = _cache_dir_for(uploaded_file.getbuffer(), uploaded_file.name)
+                    store = _load_cached_store(cache_dir)
                     dataframe = None
-                    if file_type == "pdf":
-                        text = parse_pdf(tmp_path)
-                    elif file_type == "csv":
-                        text, dataframe = parse_csv(tmp_path)
-                    elif file_type == "json":
-                        text, _ = parse_json(tmp_path)
-
-                    # Chunk
-                    chunks = chunk_text(text, source=uploaded_file.name)
-                    st.info(f"🔪 {len(chunks)} chunks created")
 
-                    # Embed
-                    embeddings = embed_chunks(chunks)
-                    st.info(f"🧠 Embeddings: {embeddings.shape}")
-
-                    # Store
-                    store = FAISSStore(dimension=embeddings.shape[1])
-                    store.add(embeddings, chunks)
+                    if store is not None:
+                        if file_type == "csv":
+                            # Only the DataFrame is needed; skip rebuilding the text
+                            dataframe = pd.read_csv(tmp_path)
+                        st.info("♻️ Loaded previously built index from cache")
+                    else:
+                        # Parse
+                        text, dataframe = PARSERS[file_type](tmp_path)
+
+                        # Chunk
+                        chunks = chunk_text(text, source=uploaded_file.name)
+                        st.info(f"🔪 {len(chunks)} chunks created")
+
+                        # Embed
+                        embeddings = embed_chunks(chunks)
+                        st.info(f"🧠 Embeddings: {embeddings.shape}")
+
+                        # Store
+                        store = FAISSStore(
+                            dimension=embeddings.shape[1],
+                            num_expected=embeddings.shape[0],
+                        )
+                        store.add(embeddings, chunks, copy=False)
+                        try:
+                            store.save(cache_dir)
+                        except OSError as e:
+                            st.warning(f"⚠️ Could not cache index: {e}")
 
                     st.session_state.store = store
                     st.session_state.dataframe = dataframe
+                    st.session_state.metrics = (
+                        precompute_metrics(dataframe) if dataframe is not None else {}
+                    )
                     st.session_state.ingested = True
                     st.session_state.chat_history = []
 
@@ -169,6 +211,7 @@ with st.sidebar:
         if st.button("🔄 Upload New File", use_container_width=True):
             st.session_state.store = None
             st.session_state.dataframe = None
+            st.session_state.metrics = {}
             st.session_state.ingested = False
             st.session_state.chat_history = []
             st.rerun()
@@ -219,32 +262,29 @@ else:
         with st.chat_message("assistant"):
             with st.status("🔍 Processing...", expanded=True) as status:
 
+                # Steps 1–2 run concurrently: retrieval does not depend on
+                # the plan, so it overlaps the planner call.
+                pool = _get_pool()
+                st.write("🔍 **Planning query and retrieving relevant chunks...**")
+                plan_future = pool.submit(plan_query, query)
+                retrieve_future = pool.submit(retrieve, query, st.session_state.store, 5)
+
                 # Step 1: Plan
-                st.write("🔍 **Planning query...**")
-                plan = plan_query(query)
+                plan = plan_future.result()
                 st.json(plan)
 
                 # Step 2: Retrieve
-                st.write("📚 **Retrieving relevant chunks...**")
-                results = retrieve(query, st.session_state.store, top_k=5)
-                chunks_text = "\n\n---\n\n".join(
-                    f"Chunk {r['metadata'].get('chunk_index', i)}:\n{r['text']}"
-                    for i, r in enumerate(results)
-                )
+                results = retrieve_future.result()
+                chunks_text = _format_chunks(results)
                 st.write(f"Found **{len(results)}** relevant chunks")
 
-                # Step 3: Tool (if numeric)
+                # Step 3: Metrics (if numeric) — precomputed at ingestion
                 metrics = None
-                if plan.get("needs_numeric") and st.session_state.dataframe is not None:
+                if plan.get("needs_numeric") and st.session_state.metrics:
                     st.write("🔢 **Running numeric analysis...**")
-                    try:
-                        df = st.session_state.dataframe
-                        numeric_cols = df.select_dtypes(include="number").columns.tolist()
-                        if numeric_cols:
-                            metrics = execute_tool(df, "average", numeric_cols[0])
-                            st.json(metrics)
-                    except Exception as e:
-                        st.warning(f"⚠️ Tool: {e}")
+                    column, stats = next(iter(st.session_state.metrics.items()))
+                    metrics = {"column": column, **stats}
+                    st.json(metrics)
 
                 # Step 4: Reason
                 st.write("💡 **Generating answer...**")
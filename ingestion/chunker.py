@@ -2,16 +2,25 @@
 chunker.py – Splits raw text into sentence-aware chunks of ~400 tokens.
 """
 
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
 
 DEFAULT_CHUNK_SIZE = 400  # approximate token target per chunk
 APPROX_CHARS_PER_TOKEN = 4  # rough English average
 
+PARALLEL_SEGMENT_CHARS = 1_000_000  # ~1 MB of text per worker task
+
+_SENT_RE = re.compile(r"(?<=[.!?])\s+")
+_PARAGRAPH_RE = re.compile(r"\n\n+")
+
 
 def _split_sentences(text: str) -> list[str]:
     """Split text into sentences using a simple regex."""
-    sentences = re.split(r"(?<=[.!?])\s+", text)
-    return [s.strip() for s in sentences if s.strip()]
+    return [s for s in (part.strip() for part in _SENT_RE.split(text)) if s]
 
 
 def _estimate_tokens(text: str) -> int:
@@ -23,6 +32,7 @@ def chunk_text(
     text: str,
     chunk_size: int = DEFAULT_CHUNK_SIZE,
     source: str = "",
+    parallel: bool = True,
 ) -> list[dict]:
     """
     Split text into chunks of approximately `chunk_size` tokens,
@@ -32,6 +42,8 @@ def chunk_text(
         text: The raw text to chunk.
         chunk_size: Target token count per chunk (default 400).
         source: Optional source identifier for metadata.
+        parallel: Allow very large text to be chunked in worker processes.
+            Pass False when already running inside a worker process.
 
     Returns:
         A list of chunk dicts, each containing:
@@ -39,37 +51,73 @@ def chunk_text(
         - "metadata": placeholder dict with chunk_index, source,
           and estimated token count.
     """
+    if parallel and len(text) > 2 * PARALLEL_SEGMENT_CHARS:
+        return _chunk_parallel(text, chunk_size, source)
+    return _chunk_serial(text, chunk_size, source)
+
+
+def _chunk_serial(text: str, chunk_size: int, source: str) -> list[dict]:
+    """Chunk a piece of text in the current process."""
     sentences = _split_sentences(text)
     chunks: list[dict] = []
-    current_sentences: list[str] = []
-    current_tokens = 0
-
-    for sentence in sentences:
-        sentence_tokens = _estimate_tokens(sentence)
-
-        # If a single sentence exceeds the limit, emit it as its own chunk
-        if sentence_tokens >= chunk_size:
-            # Flush anything accumulated first
-            if current_sentences:
-                chunks.append(_build_chunk(current_sentences, len(chunks), source))
-                current_sentences = []
-                current_tokens = 0
-            chunks.append(_build_chunk([sentence], len(chunks), source))
-            continue
-
-        # Would adding this sentence exceed the target?
-        if current_tokens + sentence_tokens > chunk_size and current_sentences:
-            chunks.append(_build_chunk(current_sentences, len(chunks), source))
-            current_sentences = []
-            current_tokens = 0
-
-        current_sentences.append(sentence)
-        current_tokens += sentence_tokens
-
-    # Flush remaining sentences
-    if current_sentences:
-        chunks.append(_build_chunk(current_sentences, len(chunks), source))
+    if not sentences:
+        return chunks
+
+    lengths = np.fromiter((len(s) for s in sentences), dtype=np.int64, count=len(sentences))
+    tokens = lengths // APPROX_CHARS_PER_TOKEN
+    # prefix[i] = estimated tokens in sentences[:i]
+    prefix = np.concatenate(([0], np.cumsum(tokens)))
+    # Sentences that exceed the limit on their own are emitted as single chunks
+    oversized = np.flatnonzero(tokens >= chunk_size)
+
+    start = 0
+    while start < len(sentences):
+        if tokens[start] >= chunk_size:
+            end = start + 1
+        else:
+            # Furthest end with prefix[end] - prefix[start] <= chunk_size ...
+            end = int(np.searchsorted(prefix, prefix[start] + chunk_size, side="right")) - 1
+            # ... but never swallowing the next oversized sentence
+            pos = np.searchsorted(oversized, start)
+            if pos < len(oversized):
+                end = min(end, int(oversized[pos]))
+
+        chunks.append(_build_chunk(sentences[start:end], len(chunks), source))
+        start = end
+
+    return chunks
+
+
+def _split_segments(text: str, segment_chars: int) -> list[str]:
+    """Group paragraphs into segments of roughly `segment_chars` characters."""
+    segments: list[str] = []
+    current: list[str] = []
+    size = 0
+    for paragraph in _PARAGRAPH_RE.split(text):
+        if current and size + len(paragraph) > segment_chars:
+            segments.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph)
+    if current:
+        segments.append("\n\n".join(current))
+    return segments
 
+
+def _chunk_parallel(text: str, chunk_size: int, source: str) -> list[dict]:
+    """
+    Chunk very large text by splitting it on paragraph breaks into ~1 MB
+    segments and chunking those in worker processes. Chunks never span a
+    segment boundary; chunk_index is renumbered globally afterwards.
+    """
+    segments = _split_segments(text, PARALLEL_SEGMENT_CHARS)
+    workers = min(len(segments), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(_chunk_serial, segments, repeat(chunk_size), repeat(source))
+        chunks = [chunk for part in parts for chunk in part]
+
+    for index, chunk in enumerate(chunks):
+        chunk["metadata"]["chunk_index"] = index
     return chunks
 
 
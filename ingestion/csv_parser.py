@@ -28,10 +28,15 @@ def parse_csv(file_path: str) -> tuple[str, pd.DataFrame]:
     except Exception as exc:
         raise ValueError(f"Failed to parse CSV: {file_path}") from exc
 
-    row_blocks = []
-    for _, row in df.iterrows():
-        lines = [f"{col}: {row[col]}" for col in df.columns]
-        row_blocks.append("\n".join(lines))
+    if df.empty:
+        return "", df
 
-    text = "\n\n".join(row_blocks)
+    # Build each row's block column-wise with vectorized string ops
+    # fillna: pandas 3 keeps missing values as NA through astype(str)
+    col_blocks = [f"{col}: " + df[col].astype(str).fillna("nan") for col in df.columns]
+    row_text = col_blocks[0]
+    for block in col_blocks[1:]:
+        row_text = row_text + "\n" + block
+
+    text = "\n\n".join(row_text.tolist())
     return text, df
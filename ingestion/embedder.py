@@ -2,32 +2,117 @@
 embedder.py – Generates embeddings for text chunks using sentence-transformers.
 """
 
+import hashlib
+import importlib.util
+import os
+import shutil
+import tempfile
+import threading
+
+import diskcache
 import numpy as np
-from sentence_transformers import SentenceTransformer
+import torch
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
 
 MODEL_NAME = "all-MiniLM-L6-v2"
 
+# int8 ONNX export of MODEL_NAME, built once and reused on CPU-only hosts
+ONNX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "minilm-int8")
+ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+def _onnx_available() -> bool:
+    """True if the optional ONNX Runtime backend (optimum + onnxruntime) is installed."""
+    return all(importlib.util.find_spec(name) is not None for name in ("optimum", "onnxruntime"))
+
+
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+BACKEND = "onnx" if DEVICE == "cpu" and _onnx_available() else "torch"
+BATCH_SIZE = 64 if DEVICE == "cuda" else 32
+
+# Chunk embeddings persisted across runs, one cache per model/backend/device
+EMBED_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "rag", "embeddings", f"{MODEL_NAME}-{BACKEND}-{DEVICE}"
+)
+
+torch.set_num_threads(os.cpu_count() or 1)
+
 _model: SentenceTransformer | None = None
+_model_lock = threading.Lock()
+_cache: diskcache.Index | None = None
+
+
+def _load_int8_model() -> SentenceTransformer:
+    """
+    Load a dynamically quantized int8 ONNX export of the model.
+
+    The first call exports and quantizes MODEL_NAME into a temporary
+    directory and renames it to ONNX_DIR once complete, so a crashed or
+    concurrent export (e.g. the app and the API server starting together)
+    never leaves a half-written model behind. Later calls (and restarts)
+    load the cached file directly.
+    """
+    if not os.path.exists(os.path.join(ONNX_DIR, ONNX_FILE)):
+        parent = os.path.dirname(ONNX_DIR)
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".minilm-int8-", dir=parent)
+        try:
+            model = SentenceTransformer(MODEL_NAME, backend="onnx")
+            model.save(tmp_dir)
+            export_dynamic_quantized_onnx_model(model, "avx512_vnni", tmp_dir)
+            try:
+                os.replace(tmp_dir, ONNX_DIR)
+            except OSError:
+                if not os.path.exists(os.path.join(ONNX_DIR, ONNX_FILE)):
+                    raise
+                # another process finished its export first; use that one
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return SentenceTransformer(ONNX_DIR, backend="onnx", model_kwargs={"file_name": ONNX_FILE})
 
 
 def _load_model() -> SentenceTransformer:
-    """Lazy-load the sentence-transformers model (singleton)."""
+    """
+    Lazy-load the embedding model (singleton).
+
+    fp16 on GPU, int8 ONNX Runtime on CPU when available, else fp32 PyTorch.
+    Chunks and queries share this instance, so both sides of a search are
+    embedded by the same backend.
+    """
     global _model
     if _model is None:
-        _model = SentenceTransformer(MODEL_NAME)
+        with _model_lock:
+            if _model is None:
+                if DEVICE == "cuda":
+                    _model = SentenceTransformer(MODEL_NAME, device=DEVICE).half()
+                elif BACKEND == "onnx":
+                    _model = _load_int8_model()
+                else:
+                    _model = SentenceTransformer(MODEL_NAME, device=DEVICE)
     return _model
 
 
+def _get_cache() -> diskcache.Index:
+    """Lazy-open the on-disk embedding cache (singleton)."""
+    global _cache
+    if _cache is None:
+        _cache = diskcache.Index(EMBED_CACHE_DIR)
+    return _cache
+
+
 def embed_chunks(chunks: list[dict]) -> np.ndarray:
     """
     Generate embeddings for a list of chunk dicts.
 
+    Embeddings are cached on disk by a hash of the chunk text, so only
+    chunks not seen before (e.g. on re-ingesting a file) go through the model.
+
     Args:
         chunks: List of chunk dicts, each containing a "text" key.
 
     Returns:
-        A numpy array of shape (n_chunks, embedding_dim) with
-        the embedding vectors.
+        A float32 numpy array of shape (n_chunks, embedding_dim) with
+        the L2-normalized embedding vectors.
 
     Raises:
         ValueError: If chunks list is empty or missing "text" keys.
@@ -41,7 +126,24 @@ def embed_chunks(chunks: list[dict]) -> np.ndarray:
             raise ValueError(f"Chunk at index {i} is missing 'text' key.")
         texts.append(chunk["text"])
 
-    model = _load_model()
-    embeddings = model.encode(texts, show_progress_bar=False)
+    cache = _get_cache()
+    keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+    vectors: list[bytes | None] = [cache.get(key) for key in keys]
+
+    misses = [i for i, vector in enumerate(vectors) if vector is None]
+    if misses:
+        model = _load_model()
+        encoded = model.encode(
+            [texts[i] for i in misses],
+            batch_size=BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            convert_to_tensor=False,
+            normalize_embeddings=True,
+        )
+        with cache.transact():
+            for i, embedding in zip(misses, encoded):
+                vectors[i] = cache[keys[i]] = embedding.astype(np.float32, copy=False).tobytes()
 
-    return np.array(embeddings)
+    # Joined into a bytearray so the result is writable, like encode()'s output
+    return np.frombuffer(bytearray().join(vectors), dtype=np.float32).reshape(len(texts), -1)
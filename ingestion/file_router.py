@@ -1,12 +1,45 @@
 """
-file_router.py – Detects and returns the file type based on extension.
+file_router.py – Detects the file type based on extension and maps it to a parser.
 
-Supported file types: pdf, csv, json.
+Supported file types: pdf, csv, json, txt, docx.
 """
 
 import os
+from collections.abc import Callable
 
-SUPPORTED_EXTENSIONS = {"pdf", "csv", "json", "txt", "docx"}
+import pandas as pd
+
+from ingestion.csv_parser import parse_csv
+from ingestion.json_parser import parse_json
+from ingestion.pdf_parser import parse_pdf
+
+
+def _parse_pdf(file_path: str) -> tuple[str, None]:
+    """Extract a PDF's text; PDFs carry no DataFrame."""
+    return parse_pdf(file_path), None
+
+
+def _parse_json(file_path: str) -> tuple[str, None]:
+    """Flatten a JSON file to text, dropping the raw parsed object."""
+    return parse_json(file_path)[0], None
+
+
+def _read_text(file_path: str) -> tuple[str, None]:
+    """Read a file as UTF-8 text, ignoring undecodable bytes."""
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read(), None
+
+
+# File type → parser returning (text, DataFrame for CSVs else None)
+PARSERS: dict[str, Callable[[str], tuple[str, pd.DataFrame | None]]] = {
+    "pdf": _parse_pdf,
+    "csv": parse_csv,
+    "json": _parse_json,
+    "txt": _read_text,
+    "docx": _read_text,
+}
+
+SUPPORTED_EXTENSIONS = frozenset(PARSERS)
 
 
 def route_file(file_path: str) -> str:
@@ -17,13 +50,14 @@ def route_file(file_path: str) -> str:
         file_path: Path to the file.
 
     Returns:
-        The file type as a lowercase string (e.g. "pdf", "csv", "json").
+        The file type as a lowercase string (e.g. "pdf", "csv", "json"),
+        usable as a key into PARSERS.
 
     Raises:
         ValueError: If the file extension is not supported.
     """
-    _, ext = os.path.splitext(file_path)
-    ext = ext.lstrip(".").lower()
+    stem, dot, ext = os.path.basename(file_path).rpartition(".")
+    ext = ext.lower() if dot and stem else ""
 
     if not ext:
         raise ValueError(f"No file extension found in path: '{file_path}'")
@@ -3,31 +3,81 @@ json_parser.py – Loads a JSON file, flattens nested keys, and converts to stru
 """
 
 import json
+import re
+from collections.abc import Iterator
 
+import orjson
 
-def _flatten(obj: dict | list, parent_key: str = "", sep: str = ".") -> dict:
+# orjson turns integers outside 64 bits into floats, silently losing digits.
+# Any run of 19+ digits may be one, so such files go to the stdlib parser.
+_RE_LONG_DIGITS = re.compile(rb"\d{19,}")
+
+
+def _loads(data: bytes) -> object:
+    """
+    Parse JSON bytes with orjson, falling back to the stdlib where it differs.
+
+    The stdlib is used for documents that may hold integers wider than 64
+    bits, and for input orjson rejects but the stdlib accepts (NaN,
+    Infinity).
+
+    Raises:
+        json.JSONDecodeError: If neither parser accepts the input.
+    """
+    if not _RE_LONG_DIGITS.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _children(prefix: str, node: object, sep: str) -> list[tuple[str, object]]:
+    """Return the (key, value) pairs directly under a dict/list node."""
+    if isinstance(node, dict):
+        return [(sep.join((prefix, key)) if prefix else key, value) for key, value in node.items()]
+    if isinstance(node, list):
+        return [("".join((prefix, "[", str(idx), "]")), value) for idx, value in enumerate(node)]
+    return []
+
+
+def _iter_flat(obj: dict | list, parent_key: str = "", sep: str = ".") -> Iterator[tuple[str, object]]:
     """
-    Recursively flatten a nested dict/list into a single-level dict
-    with dot-separated keys.
+    Yield (key, value) leaf pairs of a nested dict/list in document order,
+    with dot-separated keys and [idx] for list items.
+
+    Walks an explicit stack instead of recursing, so deep documents neither
+    hit the recursion limit nor build a temporary dict per level.
     """
-    items: list[tuple[str, object]] = []
-
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            new_key = f"{parent_key}{sep}{key}" if parent_key else key
-            if isinstance(value, (dict, list)):
-                items.extend(_flatten(value, new_key, sep).items())
-            else:
-                items.append((new_key, value))
-    elif isinstance(obj, list):
-        for idx, value in enumerate(obj):
-            new_key = f"{parent_key}[{idx}]"
-            if isinstance(value, (dict, list)):
-                items.extend(_flatten(value, new_key, sep).items())
-            else:
-                items.append((new_key, value))
-
-    return dict(items)
+    stack = _children(parent_key, obj, sep)[::-1]
+    while stack:
+        key, value = stack.pop()
+        if isinstance(value, (dict, list)):
+            stack.extend(reversed(_children(key, value, sep)))
+        else:
+            yield key, value
+
+
+def _iter_lines(raw_data: object) -> Iterator[str]:
+    """
+    Yield the "key: value" lines of a parsed JSON document.
+
+    Items of a top-level list are flattened separately and separated by a
+    blank line.
+    """
+    if not isinstance(raw_data, list):
+        for key, value in _iter_flat(raw_data):
+            yield f"{key}: {value}"
+        return
+
+    for idx, item in enumerate(raw_data):
+        if idx:
+            yield ""
+        if isinstance(item, (dict, list)):
+            for key, value in _iter_flat(item):
+                yield f"{key}: {value}"
+        else:
+            yield f"[{idx}]: {item}"
 
 
 def parse_json(file_path: str) -> tuple[str, dict | list]:
@@ -48,22 +98,11 @@ def parse_json(file_path: str) -> tuple[str, dict | list]:
         FileNotFoundError: If the file does not exist.
         ValueError: If the file cannot be parsed as JSON.
     """
+    with open(file_path, "rb") as f:
+        data = f.read()
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            raw_data = json.load(f)
-    except json.JSONDecodeError as exc:
+        raw_data = _loads(data)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
         raise ValueError(f"Failed to parse JSON: {file_path}") from exc
 
-    # Handle top-level list: flatten each item separately
-    if isinstance(raw_data, list):
-        blocks = []
-        for idx, item in enumerate(raw_data):
-            flat = _flatten(item) if isinstance(item, (dict, list)) else {f"[{idx}]": item}
-            lines = [f"{k}: {v}" for k, v in flat.items()]
-            blocks.append("\n".join(lines))
-        text = "\n\n".join(blocks)
-    else:
-        flat = _flatten(raw_data)
-        text = "\n".join(f"{k}: {v}" for k, v in flat.items())
-
-    return text, raw_data
+    return "\n".join(_iter_lines(raw_data)), raw_data
@@ -2,16 +2,95 @@
 pdf_parser.py – Extracts and cleans text from a PDF file using PyMuPDF.
 """
 
+import io
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+
 import fitz  # PyMuPDF
 
+# Even with a warm pool, each worker reopens the file and ships its text back
+# over a pipe, which outweighs the saving on documents of a few dozen pages
+# (40 pages: ~80 ms serial vs ~460+ ms with a fresh pool per call).
+PARALLEL_MIN_PAGES = 256
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+_RE_HSPACE = re.compile(r"[^\S\n]+")  # horizontal whitespace run
+_RE_BLANKS = re.compile(r"\n{3,}")  # 3+ newlines
+
+
+def _write_pages(doc: fitz.Document, start: int, stop: int, buf: io.StringIO) -> None:
+    """
+    Write pages [start, stop) of `doc` into `buf`, newline-separated.
+
+    Each page is cleaned as soon as it is extracted so only one page's raw
+    text is alive at a time.
+    """
+    for page_num in range(start, stop):
+        if page_num > start:
+            buf.write("\n")
+        buf.write(_RE_HSPACE.sub(" ", doc[page_num].get_text()))  # horizontal whitespace → single space
+
+
+def _extract_range(file_path: str, start: int, stop: int) -> str:
+    """Worker entry point: open the PDF and return cleaned pages [start, stop)."""
+    buf = io.StringIO()
+    with fitz.open(file_path) as doc:
+        _write_pages(doc, start, stop, buf)
+    return buf.getvalue()
+
+
+def _get_pool(broken: ProcessPoolExecutor | None = None) -> ProcessPoolExecutor:
+    """
+    Return the shared extraction pool, creating it on first use.
 
-def parse_pdf(file_path: str) -> str:
+    The pool is kept for the life of the process so workers are started
+    once, not per document. Pass the pool that raised BrokenProcessPool as
+    `broken` to replace it.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool is broken:
+            if broken is not None:
+                broken.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return _pool
+
+
+def _extract_parallel(file_path: str, page_count: int) -> str:
+    """
+    Extract page ranges in worker processes and join them in page order.
+
+    PyMuPDF is not thread-safe (even across separate Document objects), so
+    pages are split across processes, each opening its own copy of the file.
+    """
+    workers = min(os.cpu_count() or 1, page_count)
+    bounds = [page_count * i // workers for i in range(workers + 1)]
+    pool = _get_pool()
+    try:
+        parts = pool.map(_extract_range, repeat(file_path), bounds[:-1], bounds[1:])
+        return "\n".join(parts)
+    except BrokenProcessPool:
+        _get_pool(broken=pool)  # a worker died; give the next call a fresh pool
+        raise
+
+
+def parse_pdf(file_path: str, parallel: bool = True) -> str:
     """
     Extract text from a PDF file and return it as a single cleaned string.
 
+    Documents with at least PARALLEL_MIN_PAGES pages are extracted in
+    parallel worker processes on multi-core hosts.
+
     Args:
         file_path: Path to the PDF file.
+        parallel: Allow extraction in worker processes. Pass False when
+            already running inside a worker process.
 
     Returns:
         Extracted text with normalised whitespace.
@@ -25,16 +104,15 @@ def parse_pdf(file_path: str) -> str:
     except Exception as exc:
         raise ValueError(f"Failed to open PDF: {file_path}") from exc
 
-    pages_text = []
-    for page in doc:
-        pages_text.append(page.get_text())
-    doc.close()
-
-    raw_text = "\n".join(pages_text)
-
-    # Collapse multiple whitespace / blank lines into single spaces / newlines
-    cleaned = re.sub(r"[^\S\n]+", " ", raw_text)   # horizontal whitespace → single space
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)    # 3+ newlines → double newline
-    cleaned = cleaned.strip()
+    page_count = doc.page_count
+    if parallel and page_count >= PARALLEL_MIN_PAGES and (os.cpu_count() or 1) > 1:
+        doc.close()
+        raw_text = _extract_parallel(file_path, page_count)
+    else:
+        buf = io.StringIO()
+        _write_pages(doc, 0, page_count, buf)
+        doc.close()
+        raw_text = buf.getvalue()
 
-    return cleaned
+    cleaned = _RE_BLANKS.sub("\n\n", raw_text)  # 3+ newlines → double newline
+    return cleaned.strip()
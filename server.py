@@ -10,8 +10,11 @@ import os
 import sys
 import json
 import tempfile
+import threading
 import traceback
-from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Load .env file before anything else
 from dotenv import load_dotenv
@@ -27,7 +30,16 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 # ── App Setup ──
-app = FastAPI(title="RAG API", version="1.0.0")
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    yield
+    _io_pool.shutdown(wait=False, cancel_futures=True)
+    with _cpu_pool_lock:
+        if _cpu_pool is not None:
+            _cpu_pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="RAG API", version="1.0.0", lifespan=_lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,18 +56,91 @@ def root():
 # ── Shared State ──
 _faiss_store = None
 uploaded_files: list[str] = []
-csv_dataframes: dict = {}  # filename → pd.DataFrame
+csv_dataframes: dict = {}  # filename → {"df", "stats", "numeric_cols"}
+
+# Threads for the query pipeline (network-bound Groq calls) and for embedding
+# and storing (torch and FAISS release the GIL while they compute).
+_io_pool = ThreadPoolExecutor(max_workers=8)
+
+# Processes for parsing and chunking, which are CPU-bound Python and would
+# otherwise hold the GIL and stall in-flight queries during a large upload.
+# Created on first use and rebuilt if a worker dies (see _get_cpu_pool).
+_cpu_pool: ProcessPoolExecutor | None = None
+_cpu_pool_lock = threading.Lock()
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+
+
+class _ReadWriteLock:
+    """
+    Many concurrent readers or one exclusive writer.
+
+    Waiting writers block new readers, so a steady stream of queries cannot
+    starve an upload.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._writers_waiting == 0)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                self._cond.wait_for(lambda: self._readers == 0)
+            finally:
+                self._writers_waiting -= 1
+            try:
+                yield
+            finally:
+                self._cond.notify_all()
+
+
+# Queries search the shared store (and read csv_dataframes) as readers while
+# uploads add to it as writers; FAISS add is not safe alongside searches.
+_store_rw = _ReadWriteLock()
+_store_init_lock = threading.Lock()
+
+
+def _get_cpu_pool(broken: ProcessPoolExecutor | None = None) -> ProcessPoolExecutor:
+    """
+    Return the parse/chunk process pool, creating it on first use.
 
-# Thread pool for running sync functions that use asyncio.run() internally
-_executor = ThreadPoolExecutor(max_workers=4)
+    Pass the pool that raised BrokenProcessPool as `broken` to replace it;
+    if another upload already replaced it, the new pool is returned as-is.
+    """
+    global _cpu_pool
+    with _cpu_pool_lock:
+        if _cpu_pool is None or _cpu_pool is broken:
+            if broken is not None:
+                broken.shutdown(wait=False, cancel_futures=True)
+            _cpu_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return _cpu_pool
 
 
 def get_store():
     """Lazy-load the FAISS store."""
     global _faiss_store
     if _faiss_store is None:
-        from vector_store.faiss_store import FAISSStore
-        _faiss_store = FAISSStore(dimension=384)
+        with _store_init_lock:
+            if _faiss_store is None:
+                from vector_store.faiss_store import FAISSStore
+                _faiss_store = FAISSStore(dimension=384)
     return _faiss_store
 
 
@@ -71,6 +156,73 @@ class QueryResponse(BaseModel):
 
 
 # ── Upload Endpoint ──
+def _parse_and_chunk(tmp_path: str, filename: str) -> tuple[list[dict], dict | None]:
+    """
+    Parse and chunk a saved upload. Runs in the `_cpu_pool` process pool.
+
+    Returns:
+        (chunks, csv_entry) — chunks is empty if no text could be extracted;
+        csv_entry is {"df", "stats", "numeric_cols"} for CSV files, else None.
+    """
+    from ingestion.file_router import PARSERS, route_file
+    from ingestion.pdf_parser import parse_pdf
+    from ingestion.chunker import chunk_text
+    from agents.tool_executor import precompute_metrics
+
+    # Route file type
+    ext = route_file(filename)
+
+    # Parse — this already runs in a worker process, so PDFs are extracted
+    # serially rather than starting a nested process pool
+    if ext == "pdf":
+        text, df = parse_pdf(tmp_path, parallel=False), None
+    else:
+        text, df = PARSERS[ext](tmp_path)
+
+    if not text.strip():
+        return [], None
+
+    # Column statistics don't change between queries; compute them once here
+    csv_entry = None
+    if df is not None:
+        stats = precompute_metrics(df)
+        csv_entry = {"df": df, "stats": stats, "numeric_cols": list(stats)}
+
+    # Chunk — returns list[dict] with "text" and "metadata" keys
+    chunks = chunk_text(text, parallel=False)
+
+    # Add source filename to each chunk's metadata before storing
+    for chunk in chunks:
+        chunk.setdefault("metadata", {})
+        chunk["metadata"]["source"] = filename
+
+    return chunks, csv_entry
+
+
+def _embed_and_store(filename: str, chunks: list[dict], csv_entry: dict | None) -> dict:
+    """Embed parsed chunks and add them to the shared store. Runs in `_io_pool`."""
+    from ingestion.embedder import embed_chunks
+
+    # Embed — accepts list[dict] with "text" key
+    embeddings = embed_chunks(chunks)
+
+    # Store
+    with _store_rw.write():
+        faiss_store = get_store()
+        faiss_store.add(embeddings, chunks, copy=False)
+        if csv_entry is not None:
+            csv_dataframes[filename] = csv_entry
+        uploaded_files.append(filename)
+        total_chunks = faiss_store.count()
+
+    return {
+        "status": "success",
+        "filename": filename,
+        "chunks_added": len(chunks),
+        "total_chunks": total_chunks,
+    }
+
+
 @app.post("/api/upload")
 async def upload_file(file: UploadFile = File(...)):
     """Accept a file, parse → chunk → embed → store in FAISS."""
@@ -78,63 +230,24 @@ async def upload_file(file: UploadFile = File(...)):
     suffix = os.path.splitext(file.filename or "")[1]
     tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
     try:
-        content = await file.read()
-        tmp.write(content)
+        # Stream the body to disk instead of holding the whole file in memory
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            tmp.write(chunk)
         tmp.close()
-        tmp_path = tmp.name
-
-        from ingestion.file_router import route_file
-        from ingestion.pdf_parser import parse_pdf
-        from ingestion.csv_parser import parse_csv
-        from ingestion.json_parser import parse_json
-        from ingestion.chunker import chunk_text
-        from ingestion.embedder import embed_chunks
-
-        # Route file type
-        ext = route_file(file.filename)
-
-        # Parse
-        text = ""
-        df = None
-
-        if ext == "pdf":
-            text = parse_pdf(tmp_path)
-        elif ext == "csv":
-            text, df = parse_csv(tmp_path)
-            csv_dataframes[file.filename] = df
-        elif ext == "json":
-            text, _ = parse_json(tmp_path)
-        elif ext in ("txt", "docx"):
-            with open(tmp_path, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported file type: {ext}")
 
-        if not text.strip():
+        import asyncio
+        loop = asyncio.get_running_loop()
+        cpu_pool = _get_cpu_pool()
+        try:
+            chunks, csv_entry = await loop.run_in_executor(cpu_pool, _parse_and_chunk, tmp.name, file.filename)
+        except BrokenProcessPool:
+            # A worker died (e.g. a parser crash or the OOM killer); fail this
+            # upload only and give later uploads a fresh pool.
+            _get_cpu_pool(broken=cpu_pool)
+            raise HTTPException(status_code=500, detail="Worker process crashed while parsing the file.")
+        if not chunks:
             raise HTTPException(status_code=400, detail="No text could be extracted from file.")
-
-        # Chunk — returns list[dict] with "text" and "metadata" keys
-        chunks = chunk_text(text)
-
-        # Embed — accepts list[dict] with "text" key
-        embeddings = embed_chunks(chunks)
-
-        # Store
-        faiss_store = get_store()
-        # Add source filename to each chunk's metadata before storing
-        for chunk in chunks:
-            chunk.setdefault("metadata", {})
-            chunk["metadata"]["source"] = file.filename
-        faiss_store.add(embeddings, chunks)
-
-        uploaded_files.append(file.filename)
-
-        return {
-            "status": "success",
-            "filename": file.filename,
-            "chunks_added": len(chunks),
-            "total_chunks": faiss_store.count(),
-        }
+        return await loop.run_in_executor(_io_pool, _embed_and_store, file.filename, chunks, csv_entry)
 
     except HTTPException:
         raise
@@ -142,6 +255,7 @@ async def upload_file(file: UploadFile = File(...)):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
     finally:
+        tmp.close()
         if os.path.exists(tmp.name):
             os.unlink(tmp.name)
 
@@ -195,11 +309,10 @@ def _format_answer(answer) -> str:
 def _run_query_pipeline(question: str) -> dict:
     """
     Run the full RAG pipeline synchronously in a separate thread.
-    This avoids the asyncio.run() conflict with FastAPI's event loop.
+    This avoids nesting the agents' event loop inside FastAPI's running loop.
     """
     from agents.planner import plan_query
     from agents.retriever import retrieve
-    from agents.tool_executor import execute as tool_execute
     from agents.reasoner import reason
 
     store = get_store()
@@ -207,28 +320,23 @@ def _run_query_pipeline(question: str) -> dict:
     # 1. Plan
     plan = plan_query(question)
 
-    # 2. Retrieve
-    results = retrieve(question, store, top_k=5)
-    chunks_text = "\n\n---\n\n".join(r["text"] for r in results)
-    sources = list(set(r["metadata"].get("source", "unknown") for r in results))
+    with _store_rw.read():
+        # 2. Retrieve
+        results = retrieve(question, store, top_k=5)
 
-    # 3. Tool execution (if numeric analysis needed + CSV data available)
-    metrics = None
-    if plan.get("needs_numeric") and csv_dataframes:
-        try:
-            first_df_name = list(csv_dataframes.keys())[0]
-            df = csv_dataframes[first_df_name]
-            numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
-            if numeric_cols:
+        # 3. Tool execution (if numeric analysis needed + CSV data available)
+        metrics = None
+        if plan.get("needs_numeric") and csv_dataframes:
+            csv_entry = next(iter(csv_dataframes.values()))
+            if csv_entry["numeric_cols"]:
                 metrics = []
-                for col in numeric_cols[:3]:
-                    try:
-                        metrics.append(tool_execute(df, "average", col))
-                        metrics.append(tool_execute(df, "sum", col))
-                    except Exception:
-                        pass
-        except Exception:
-            pass
+                for col in csv_entry["numeric_cols"][:3]:
+                    stats = csv_entry["stats"][col]
+                    metrics.append({"operation": "average", "column": col, "result": stats["average"]})
+                    metrics.append({"operation": "sum", "column": col, "result": stats["sum"]})
+
+    chunks_text = "\n\n---\n\n".join(r["text"] for r in results)
+    sources = list(dict.fromkeys(r["metadata"].get("source", "unknown") for r in results))  # best match first
 
     # 4. Reason
     result = reason(question, chunks_text, metrics)
@@ -272,7 +380,7 @@ async def query_documents(req: QueryRequest):
     try:
         import asyncio
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(_executor, _run_query_pipeline, req.question)
+        result = await loop.run_in_executor(_io_pool, _run_query_pipeline, req.question)
         return QueryResponse(**result)
 
     except Exception as e:
@@ -293,4 +401,11 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop does not support Windows; httptools is installed by uvicorn[standard]
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+    )
@@ -13,9 +13,15 @@ Required tables in Supabase:
     - user_query   TEXT
     - system_response TEXT
     - created_at   TIMESTAMPTZ (default now())
+
+Conversation turns are buffered and written in batches: one insert per
+FLUSH_MAX_ROWS rows or FLUSH_INTERVAL_S seconds, whichever comes first.
 """
 
+import atexit
 import os
+import threading
+import traceback
 from datetime import datetime
 
 from supabase import create_client, Client
@@ -23,8 +29,16 @@ from supabase import create_client, Client
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 
+FLUSH_MAX_ROWS = 50
+FLUSH_INTERVAL_S = 0.2
+
 _client: Client | None = None
 
+_pending: list[dict] = []
+_pending_lock = threading.Lock()
+_flush_lock = threading.Lock()  # keeps batches in insertion order
+_flush_timer: threading.Timer | None = None
+
 
 def _get_client() -> Client:
     """Lazy-init the Supabase client (singleton)."""
@@ -51,30 +65,82 @@ def create_session() -> str:
     return session_id
 
 
+def _schedule_flush(delay: float) -> None:
+    """(Re)arm the background flush timer. Caller must hold _pending_lock."""
+    global _flush_timer
+    if _flush_timer is not None:
+        _flush_timer.cancel()
+    _flush_timer = threading.Timer(delay, _flush_in_background)
+    _flush_timer.daemon = True
+    _flush_timer.start()
+
+
+def _flush_in_background() -> None:
+    try:
+        flush_conversations()
+    except Exception:
+        traceback.print_exc()
+
+
+def flush_conversations() -> None:
+    """
+    Write all buffered conversation turns to Supabase in a single insert.
+
+    If the insert fails, the rows are put back at the head of the buffer to
+    be retried by the next flush, and the error is re-raised.
+    """
+    global _flush_timer
+    with _flush_lock:
+        with _pending_lock:
+            rows = _pending[:]
+            _pending.clear()
+            if _flush_timer is not None:
+                _flush_timer.cancel()
+                _flush_timer = None
+        if not rows:
+            return
+        try:
+            _get_client().table("conversations").insert(rows).execute()
+        except Exception:
+            with _pending_lock:
+                _pending[:0] = rows
+            raise
+
+
+atexit.register(flush_conversations)
+
+
 def store_conversation(
     session_id: str,
     user_query: str,
     system_response: str,
-) -> dict:
+) -> None:
     """
-    Store a single conversation turn (query + response) in the conversations table.
+    Queue a single conversation turn (query + response) for the conversations table.
+
+    Returns immediately; the row is inserted by the next batched flush.
+    Call flush_conversations() to force it out.
 
     Args:
         session_id: The UUID of the active session.
         user_query: The user's question.
         system_response: The system's answer.
 
-    Returns:
-        The inserted row as a dict.
+    Raises:
+        ValueError: If the Supabase credentials are not configured.
     """
-    client = _get_client()
+    _get_client()  # fail fast on missing configuration
     row = {
         "session_id": session_id,
         "user_query": user_query,
         "system_response": system_response,
     }
-    response = client.table("conversations").insert(row).execute()
-    return response.data[0]
+    with _pending_lock:
+        _pending.append(row)
+        if len(_pending) >= FLUSH_MAX_ROWS:
+            _schedule_flush(0)
+        elif _flush_timer is None:
+            _schedule_flush(FLUSH_INTERVAL_S)
 
 
 def get_session_history(session_id: str) -> list[dict]:
@@ -87,6 +153,7 @@ def get_session_history(session_id: str) -> list[dict]:
     Returns:
         List of dicts with user_query, system_response, and created_at.
     """
+    flush_conversations()  # include turns still sitting in the buffer
     client = _get_client()
     response = (
         client.table("conversations")
@@ -3,78 +3,222 @@ faiss_store.py – FAISS-based vector store for storing and searching chunk embe
 """
 
 import json
+import math
 import os
 
 import faiss
+import msgpack
 import numpy as np
 
+FLAT_MAX_VECTORS = 50_000  # exhaustive search is fast enough below this
+HNSW_MAX_VECTORS = 200_000  # above this, int8 IVF keeps memory and latency in check
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+IVF_NPROBE = 16
+
+faiss.omp_set_num_threads(os.cpu_count() or 1)
+
+
+def _build_index(dimension: int, num_expected: int) -> faiss.Index:
+    """Pick an index type suited to the expected number of vectors."""
+    if num_expected <= FLAT_MAX_VECTORS:
+        # Exhaustive scan over float16 codes: half the bytes read per query
+        return faiss.IndexScalarQuantizer(
+            dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+        )
+    if num_expected <= HNSW_MAX_VECTORS:
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+
+    nlist = int(4 * math.sqrt(num_expected))
+    quantizer = faiss.IndexFlatIP(dimension)
+    index = faiss.IndexIVFScalarQuantizer(
+        quantizer, dimension, nlist, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+    )
+    index.nprobe = IVF_NPROBE
+    return index
+
+
+def _search_params(index: faiss.Index) -> dict:
+    """Return the tunable search parameters of an index."""
+    if isinstance(index, faiss.IndexHNSW):
+        return {"ef_search": index.hnsw.efSearch}
+    if isinstance(index, faiss.IndexIVF):
+        return {"nlist": index.nlist, "nprobe": index.nprobe}
+    return {}
+
+
+def _apply_search_params(index: faiss.Index, params: dict) -> None:
+    """Restore search parameters saved by `_search_params`."""
+    if "ef_search" in params and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = params["ef_search"]
+    if "nprobe" in params and isinstance(index, faiss.IndexIVF):
+        index.nprobe = params["nprobe"]
+
+
+def _load_json_chunks(path: str) -> tuple[list[str], list[dict]]:
+    """Read chunk texts and metadata from a chunks.json written by older versions."""
+    with open(path, "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    if isinstance(chunks, list):  # list of chunk dicts
+        return [c.get("text", "") for c in chunks], [c.get("metadata", {}) for c in chunks]
+    return chunks["texts"], chunks["metadatas"]
+
 
 class FAISSStore:
     """
     A lightweight FAISS vector store that maps embeddings to chunk texts.
 
+    The index type follows the expected corpus size: an exhaustive scan
+    over float16-quantized vectors for small corpora, HNSW up to
+    HNSW_MAX_VECTORS, and an int8 scalar-quantized IVF index beyond that
+    (trained on the first batch passed to `add`).
+
+    Similarity is cosine: vectors are L2-normalized on `add` and `search`
+    and compared by inner product, so scores lie in [-1, 1] and higher
+    means more similar.
+
+    The FAISS index is the only copy of the vectors (read them back with
+    `get_vectors`); `texts` and `metadatas` hold just the chunk fields.
+
     Args:
         dimension: Embedding vector dimension (default 384 for all-MiniLM-L6-v2).
+        num_expected: Expected number of vectors; 0 (unknown) selects the
+            exhaustive float16 index.
     """
 
-    def __init__(self, dimension: int = 384):
+    def __init__(self, dimension: int = 384, num_expected: int = 0):
         self.dimension = dimension
-        self.index = faiss.IndexFlatL2(dimension)
-        self.chunks: list[dict] = []  # parallel list of chunk dicts
+        self.index = _build_index(dimension, num_expected)
+        # Chunk fields stored column-wise, aligned with index ids
+        self.texts: list[str] = []
+        self.metadatas: list[dict] = []
 
     def count(self) -> int:
         """Return the number of stored chunks."""
         return self.index.ntotal
 
-    def add(self, embeddings: np.ndarray, chunks: list[dict]) -> None:
+    def get_vectors(self, start: int = 0, n: int | None = None) -> np.ndarray:
+        """
+        Reconstruct stored vectors from the index.
+
+        Vectors come back as stored: L2-normalized and, for the quantized
+        index types, decoded from their fp16/int8 codes (so approximate).
+
+        Args:
+            start: Id of the first vector.
+            n: Number of vectors; defaults to all from `start` to the end.
+
+        Returns:
+            A float32 array of shape (n, dimension).
+        """
+        if n is None:
+            n = self.index.ntotal - start
+        return self.index.reconstruct_n(start, n)
+
+    def add(self, embeddings: np.ndarray, chunks: list[dict], copy: bool = True) -> None:
         """
         Add embeddings and their corresponding chunks to the store.
 
         Args:
             embeddings: Array of shape (n, dimension).
             chunks: List of chunk dicts (must have "text" key).
+            copy: If False and `embeddings` is a writable C-contiguous float32
+                array, it is L2-normalized in place instead of copied. Only
+                pass False for arrays the caller owns and no longer needs.
         """
         if embeddings.shape[0] != len(chunks):
             raise ValueError(
                 f"Mismatch: {embeddings.shape[0]} embeddings vs {len(chunks)} chunks."
             )
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dimension:
+            raise ValueError(
+                f"Expected embeddings of shape (n, {self.dimension}), got {embeddings.shape}."
+            )
 
-        self.index.add(embeddings.astype(np.float32))
-        self.chunks.extend(chunks)
+        texts = [chunk.get("text", "") for chunk in chunks]
+        metadatas = [chunk.get("metadata", {}) for chunk in chunks]
 
-    def search(self, query_embedding: np.ndarray, top_k: int = 5) -> list[dict]:
+        in_place = (
+            not copy
+            and embeddings.dtype == np.float32
+            and embeddings.flags["C_CONTIGUOUS"]
+            and embeddings.flags["WRITEABLE"]
+        )
+        if not in_place:
+            embeddings = np.array(embeddings, dtype=np.float32, order="C")  # private copy
+        faiss.normalize_L2(embeddings)
+
+        # Extend the chunk lists first so every id the index can return
+        # already has its text; roll back if FAISS rejects the batch.
+        start = len(self.texts)
+        self.texts.extend(texts)
+        self.metadatas.extend(metadatas)
+        try:
+            if not self.index.is_trained:
+                self.index.train(embeddings)
+            self.index.add(embeddings)
+        except Exception:
+            del self.texts[start:]
+            del self.metadatas[start:]
+            raise
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 5, normalized: bool = False) -> list[dict]:
         """
         Search for the most similar chunks to a query embedding.
 
         Args:
             query_embedding: A 1-D or 2-D array of the query vector.
             top_k: Number of top results to return.
+            normalized: Set if the vector is already L2-normalized, to skip
+                the copy and re-normalization.
 
         Returns:
-            List of dicts with "text", "metadata", "score" for each match.
+            List of dicts with "text", "metadata", "score" for each match,
+            best (highest cosine similarity) first.
+        """
+        return self.search_batch(np.reshape(query_embedding, (1, -1)), top_k, normalized)[0]
+
+    def search_batch(self, queries: np.ndarray, top_k: int = 5, normalized: bool = False) -> list[list[dict]]:
+        """
+        Search for several queries in one FAISS call.
+
+        FAISS spreads a batch across its OpenMP threads, so concurrent
+        queries are cheaper searched together than one at a time.
+
+        Args:
+            queries: Array of shape (n_queries, dimension).
+            top_k: Number of top results to return per query.
+            normalized: Set if the rows are already L2-normalized, to skip
+                the copy and re-normalization.
+
+        Returns:
+            One result list per query, in the same format as `search`.
         """
         if self.index.ntotal == 0:
-            return []
+            return [[] for _ in range(len(queries))]
 
-        query = np.array(query_embedding, dtype=np.float32)
-        if query.ndim == 1:
-            query = query.reshape(1, -1)
+        if normalized:
+            queries = np.ascontiguousarray(queries, dtype=np.float32)  # no copy if already float32 C-order
+        else:
+            queries = np.array(queries, dtype=np.float32, ndmin=2)  # copy, normalized in place
+            faiss.normalize_L2(queries)
 
         top_k = min(top_k, self.index.ntotal)
-        distances, indices = self.index.search(query, top_k)
+        distances, indices = self.index.search(queries, top_k)
 
-        results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            if idx == -1:
-                continue
-            chunk = self.chunks[idx]
-            results.append({
-                "text": chunk.get("text", ""),
-                "metadata": chunk.get("metadata", {}),
-                "score": float(dist),
-            })
-
-        return results
+        texts, metadatas = self.texts, self.metadatas
+        return [
+            [
+                {"text": texts[idx], "metadata": metadatas[idx], "score": dist}
+                for dist, idx in zip(row_distances, row_indices)
+                if idx != -1
+            ]
+            for row_distances, row_indices in zip(distances.tolist(), indices.tolist())
+        ]
 
     # ------------------------------------------------------------------
     # Optional persistence
@@ -82,30 +226,53 @@ class FAISSStore:
 
     def save(self, directory: str) -> None:
         """
-        Persist the FAISS index and chunk metadata to disk.
+        Persist the FAISS index, its search parameters and chunk metadata to disk.
 
         Args:
             directory: Folder to save into (created if it doesn't exist).
         """
         os.makedirs(directory, exist_ok=True)
         faiss.write_index(self.index, os.path.join(directory, "index.faiss"))
-        with open(os.path.join(directory, "chunks.json"), "w", encoding="utf-8") as f:
-            json.dump(self.chunks, f, ensure_ascii=False)
+        with open(os.path.join(directory, "chunks.msgpack"), "wb") as f:
+            msgpack.pack({"texts": self.texts, "metadatas": self.metadatas}, f, use_bin_type=True)
+        with open(os.path.join(directory, "store.json"), "w", encoding="utf-8") as f:
+            json.dump(_search_params(self.index), f)
 
     @classmethod
-    def load(cls, directory: str, dimension: int = 384) -> "FAISSStore":
+    def load(cls, directory: str, dimension: int = 384, mmap: bool = False) -> "FAISSStore":
         """
         Load a previously saved FAISSStore from disk.
 
         Args:
-            directory: Folder containing index.faiss and chunks.json.
+            directory: Folder containing index.faiss and chunks.msgpack
+                (or chunks.json, from older versions).
             dimension: Embedding dimension (must match saved index).
+            mmap: Memory-map the index file so vectors are paged in on
+                demand instead of copied into RAM up front.
 
         Returns:
             A populated FAISSStore instance.
+
+        Raises:
+            ValueError: If the saved index was built with L2 distance.
         """
         store = cls(dimension=dimension)
-        store.index = faiss.read_index(os.path.join(directory, "index.faiss"))
-        with open(os.path.join(directory, "chunks.json"), "r", encoding="utf-8") as f:
-            store.chunks = json.load(f)
+        io_flags = faiss.IO_FLAG_MMAP if mmap else 0
+        store.index = faiss.read_index(os.path.join(directory, "index.faiss"), io_flags)
+        if store.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            raise ValueError(
+                f"Index in {directory} uses L2 distance; rebuild it for cosine similarity."
+            )
+        store.dimension = store.index.d
+        msgpack_path = os.path.join(directory, "chunks.msgpack")
+        if os.path.exists(msgpack_path):
+            with open(msgpack_path, "rb") as f:
+                chunks = msgpack.unpack(f, raw=False)
+            store.texts, store.metadatas = chunks["texts"], chunks["metadatas"]
+        else:
+            store.texts, store.metadatas = _load_json_chunks(os.path.join(directory, "chunks.json"))
+        params_path = os.path.join(directory, "store.json")
+        if os.path.exists(params_path):  # absent in stores saved by older versions
+            with open(params_path, "r", encoding="utf-8") as f:
+                _apply_search_params(store.index, json.load(f))
         return store